@@ -1,8 +1,14 @@
+import lzma
+import os
+import pickle
+from contextlib import suppress
 from datetime import datetime
+from tempfile import mkstemp
 
 from matplotlib.collections import LineCollection
 from matplotlib.pyplot import subplots, close
 from numpy import array, rollaxis, clip, amax
+from pandas import read_pickle
 from pytz import timezone, utc
 from skyfield import api, projections
 from skyfield.data import hipparcos, stellarium
@@ -57,6 +63,115 @@ MAGNITUDE_LEVELS = [
     "15 - show all the stars",
 ]
 
+CACHE_DIR = "cache"
+HIPPARCOS_CACHE = os.path.join(CACHE_DIR, "hipparcos.pkl.xz")
+CONSTELLATIONS_CACHE = os.path.join(CACHE_DIR, "constellations.pkl.xz")
+CONSTELLATIONS_URL = (
+    "https://raw.githubusercontent.com/Stellarium/stellarium/master"
+    "/skycultures/modern_st/constellationship.fab"
+)
+
+# errors that mean a cache file is unusable rather than something going wrong
+CACHE_READ_ERRORS = (
+    EOFError,
+    lzma.LZMAError,
+    pickle.UnpicklingError,
+    ValueError,
+    AttributeError,
+    ImportError,
+)
+CACHE_WRITE_ERRORS = (OSError, pickle.PicklingError)
+
+# data shared between runs, loaded on first use by _load_catalog()
+_EPH = None
+_STARS_DF = None
+_EDGES_ARR = None
+
+ts = api.load.timescale()
+
+
+def _read_cache(path: str, read):
+    if not os.path.exists(path):
+        return None
+
+    # a truncated or incompatible cache file is dropped and rebuilt
+    try:
+        return read(path)
+    except CACHE_READ_ERRORS:
+        with suppress(OSError):
+            os.remove(path)
+        return None
+
+
+def _write_cache(path: str, write):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+
+    # write next to the final file and swap it in, so an interrupted
+    # write never leaves a partial cache behind
+    fd, tmp_path = mkstemp(dir=CACHE_DIR, suffix=".tmp")
+    os.close(fd)
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        with suppress(OSError):
+            os.remove(tmp_path)
+        raise
+
+
+def _read_edges(path: str):
+    with lzma.open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def _write_edges(path: str, edges_arr):
+    with lzma.open(path, "wb") as f:
+        pickle.dump(edges_arr, f)
+
+
+def _load_catalog():
+    global _EPH, _STARS_DF, _EDGES_ARR
+
+    # de421 shows position of earth and sun in space
+    if _EPH is None:
+        _EPH = api.load("de421.bsp")
+
+    # hipparcos dataset contains star location data
+    if _STARS_DF is None:
+        _STARS_DF = _read_cache(
+            HIPPARCOS_CACHE, lambda path: read_pickle(path, compression="xz")
+        )
+
+    if _STARS_DF is None:
+        with api.load.open(hipparcos.URL) as f:
+            _STARS_DF = hipparcos.load_dataframe(f)
+        # the disk cache is only a speedup, so failing to write it is not fatal
+        with suppress(*CACHE_WRITE_ERRORS):
+            _write_cache(
+                HIPPARCOS_CACHE,
+                lambda path: _STARS_DF.to_pickle(path, compression="xz"),
+            )
+
+    # only the star ids at both ends of each constellation line are kept
+    if _EDGES_ARR is None:
+        _EDGES_ARR = _read_cache(CONSTELLATIONS_CACHE, _read_edges)
+
+    if _EDGES_ARR is None:
+        with api.load.open(CONSTELLATIONS_URL) as f:
+            constellations = stellarium.parse_constellations(f)
+
+        edges = [edge for name, edges in constellations for edge in edges]
+        edges_star1 = array([star1 for star1, star2 in edges], dtype=int)
+        edges_star2 = array([star2 for star1, star2 in edges], dtype=int)
+        _EDGES_ARR = (edges_star1, edges_star2)
+
+        with suppress(*CACHE_WRITE_ERRORS):
+            _write_cache(
+                CONSTELLATIONS_CACHE, lambda path: _write_edges(path, _EDGES_ARR)
+            )
+
+    return _EPH, _STARS_DF, _EDGES_ARR
+
 
 def generate_starmap(
     use_constellations: bool,
@@ -124,20 +239,10 @@ def generate_starmap(
         )
         return
 
-    # de421 shows position of earth and sun in space
-    eph = api.load("de421.bsp")
+    eph, stars, (edges_star1, edges_star2) = _load_catalog()
 
-    # hipparcos dataset contains star location data
-    with api.load.open(hipparcos.URL) as f:
-        stars = hipparcos.load_dataframe(f)
-
-    url = (
-        "https://raw.githubusercontent.com/Stellarium/stellarium/master"
-        "/skycultures/modern_st/constellationship.fab"
-    )
-
-    with api.load.open(url) as f:
-        constellations = stellarium.parse_constellations(f)
+    # work on a copy so projected positions don't leak into the cached catalog
+    stars = stars.copy()
 
     # define datetime and convert to utc based on our timezone
     tf = TimezoneFinder()
@@ -153,7 +258,6 @@ def generate_starmap(
     earth = eph["earth"]
 
     # define observation time from our UTC datetime
-    ts = api.load.timescale()
     t = ts.from_datetime(utc_dt)
 
     # define an observer using the world geodetic system data
@@ -172,10 +276,6 @@ def generate_starmap(
     star_positions = earth.at(t).observe(api.Star.from_dataframe(stars))
     stars["x"], stars["y"] = projection(star_positions)
 
-    edges = [edge for name, edges in constellations for edge in edges]
-    edges_star1 = [star1 for star1, star2 in edges]
-    edges_star2 = [star2 for star1, star2 in edges]
-
     print("Max bright before magnitude: " + str(amax(stars.magnitude)))
 
     bright_stars = stars.magnitude <= max_magnitude